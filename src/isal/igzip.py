@@ -12,7 +12,8 @@
 # - _GzipReader is implemented in C in isal_zlib and allows dropping the GIL.
 # - Gzip.compress does not use a GzipFile to compress in memory, but creates a
 #   simple header using _create_simple_gzip_header and compresses the data with
-#   igzip_lib.compress using the DECOMP_GZIP_NO_HDR flag. This change was
+#   igzip_lib._compress_with_header using the COMP_GZIP_NO_HDR flag, which
+#   places the header in front of the compressed data. This change was
 #   ported to Python 3.11, using zlib.compress(wbits=-15) in that instance.
 # - Gzip.decompress creates an isal_zlib.decompressobj and decompresses the
 #   data that way instead of using GzipFile. This change was ported to
@@ -24,14 +25,15 @@
 """Similar to the stdlib gzip module. But using the Intel Storage Accelaration
 Library to speed up its methods."""
 
-import argparse
 import builtins
 import gzip
 import io
 import os
-import shutil
+import queue
+import stat
 import struct
 import sys
+import threading
 import time
 from typing import Optional, SupportsInt
 
@@ -50,6 +52,15 @@ _COMPRESS_LEVEL_BEST = isal_zlib.ISAL_BEST_COMPRESSION
 # After 512K the performance does not increase anymore on a Ryzen 5 3600 test
 # system.
 READ_BUFFER_SIZE = 512 * 1024
+# Pipes and sockets rarely deliver more than 128K at once, while large files
+# on fast storage benefit from larger reads.
+_PIPE_READ_BUFFER_SIZE = 128 * 1024
+_LARGE_FILE_READ_BUFFER_SIZE = 1024 * 1024
+_LARGE_FILE_SIZE = 64 * 1024 * 1024
+# Size of the buffer holding decompressed data. Larger than the default
+# io.DEFAULT_BUFFER_SIZE to reduce the number of calls into the decompressor
+# for small reads such as readline.
+_DECOMPRESSED_BUFFER_SIZE = 128 * 1024
 
 FTEXT, FHCRC, FEXTRA, FNAME, FCOMMENT = 1, 2, 4, 8, 16
 READ = gzip.READ
@@ -107,6 +118,18 @@ def open(filename, mode="rb", compresslevel=_COMPRESS_LEVEL_TRADEOFF,
         return binary_file
 
 
+# Python 3.9 added a `compresslevel` parameter to write gzip header.
+# This only determines the value of one extra flag. Because this change
+# was backported to 3.7 and 3.8 in later point versions, the attributes
+# of the function should be checked before trying to use the
+# compresslevel parameter.
+_HEADER_HAS_COMPRESSLEVEL = (
+    "compresslevel" in
+    gzip.GzipFile._write_gzip_header.__code__.co_varnames  # type: ignore
+    and hasattr(gzip, "_COMPRESS_LEVEL_FAST")
+    and hasattr(gzip, "_COMPRESS_LEVEL_TRADEOFF"))
+
+
 class IGzipFile(gzip.GzipFile):
     """The IGzipFile class simulates most of the methods of a file object with
     the exception of the truncate() method.
@@ -114,9 +137,12 @@ class IGzipFile(gzip.GzipFile):
     This class only supports opening files in binary mode. If you need to open
     a compressed file in text mode, use the gzip.open() function.
     """
+    _prefetcher = None
+
     def __init__(self, filename=None, mode=None,
                  compresslevel=isal_zlib.ISAL_DEFAULT_COMPRESSION,
-                 fileobj=None, mtime=None):
+                 fileobj=None, mtime=None, *, prefetch=False,
+                 buffer_size=None):
         """Constructor for the IGzipFile class.
 
         At least one of fileobj and filename must be given a
@@ -147,6 +173,17 @@ class IGzipFile(gzip.GzipFile):
         The mtime argument is an optional numeric timestamp to be written
         to the last modification time field in the stream when compressing.
         If omitted or None, the current time is used.
+
+        The prefetch argument only applies to reading. When True, the
+        compressed input is read from the underlying file in a background
+        thread while the current block is decompressed, overlapping I/O with
+        decompression. The thread stops when the thread that opened the file
+        exits, so reading the file from another thread after that raises
+        OSError.
+
+        The buffer_size argument only applies to reading. It sets the amount
+        of compressed data that is read at once. If omitted or None, it is
+        chosen based on the type and size of the underlying file.
         """
         if not (isal_zlib.ISAL_BEST_SPEED <= compresslevel
                 <= isal_zlib.ISAL_BEST_COMPRESSION) and "r" not in mode:
@@ -155,6 +192,21 @@ class IGzipFile(gzip.GzipFile):
                 f"{isal_zlib.ISAL_BEST_SPEED} and "
                 f"{isal_zlib.ISAL_BEST_COMPRESSION}, got {compresslevel}."
             )
+        if (mode or getattr(fileobj, "mode", "rb")).startswith("r"):
+            # gzip.GzipFile.__init__ would set up a zlib based reader that is
+            # immediately discarded, so the read path is initialized here.
+            self._setup_read(filename, mode, fileobj, prefetch, buffer_size)
+            return
+        if prefetch:
+            raise ValueError("prefetch can only be used when reading")
+        if buffer_size is not None:
+            raise ValueError("buffer_size can only be used when reading")
+        if mode and mode.startswith(("w", "a", "x")):
+            # Likewise, the zlib compressobj created by gzip.GzipFile.__init__
+            # would be replaced right away. Its initialization costs about as
+            # much as the rest of opening the file.
+            self._setup_write(filename, mode, compresslevel, fileobj, mtime)
+            return
         super().__init__(filename, mode, compresslevel, fileobj, mtime)
         if self.mode == WRITE:
             self.compress = isal_zlib.compressobj(compresslevel,
@@ -162,20 +214,69 @@ class IGzipFile(gzip.GzipFile):
                                                   -isal_zlib.MAX_WBITS,
                                                   isal_zlib.DEF_MEM_LEVEL,
                                                   0)
-        if self.mode == READ:
-            raw = _GzipReader(self.fileobj, READ_BUFFER_SIZE)
-            self._buffer = io.BufferedReader(raw)
+
+    def _setup_file(self, filename, mode, fileobj):
+        # Mode and filename handling are the same as in gzip.GzipFile.
+        if mode and ('t' in mode or 'U' in mode):
+            raise ValueError("Invalid mode: {!r}".format(mode))
+        if mode and 'b' not in mode:
+            mode += 'b'
+        if fileobj is None:
+            fileobj = self.myfileobj = builtins.open(filename, mode or 'rb')
+        if filename is None:
+            filename = getattr(fileobj, 'name', '')
+            if not isinstance(filename, (str, bytes)):
+                filename = ''
+        else:
+            filename = os.fspath(filename)
+        return filename, fileobj
+
+    def _setup_read(self, filename, mode, fileobj, prefetch, buffer_size):
+        if buffer_size is not None and buffer_size < 1:
+            raise ValueError(
+                f"buffer_size must be at least 1, got {buffer_size}")
+        filename, fileobj = self._setup_file(filename, mode, fileobj)
+        self.mode = READ
+        self.name = filename
+        fp = fileobj
+        if buffer_size is None:
+            buffer_size = _read_buffer_size(fp)
+        if prefetch:
+            fp = self._prefetcher = _PrefetchReader(fp, buffer_size)
+        raw = _GzipReader(fp, buffer_size)
+        self._buffer = io.BufferedReader(raw, _DECOMPRESSED_BUFFER_SIZE)
+        self.fileobj = fileobj
+
+    def _setup_write(self, filename, mode, compresslevel, fileobj, mtime):
+        filename, fileobj = self._setup_file(filename, mode, fileobj)
+        self.mode = WRITE
+        self._init_write(filename)
+        self.compress = isal_zlib.compressobj(compresslevel,
+                                              isal_zlib.DEFLATED,
+                                              -isal_zlib.MAX_WBITS,
+                                              isal_zlib.DEF_MEM_LEVEL,
+                                              0)
+        self._write_mtime = mtime
+        if hasattr(gzip, "_WriteBufferStream"):
+            # Python 3.12+ gzip.GzipFile.close and flush expect a write buffer.
+            # IGzipFile.write does not use it, so it always stays empty.
+            self._buffer_size = gzip._WRITE_BUFFER_SIZE
+            self._buffer = io.BufferedWriter(
+                gzip._WriteBufferStream(self), buffer_size=self._buffer_size)
+        self.fileobj = fileobj
+        self._write_gzip_header(compresslevel)
+
+    def close(self):
+        # Stop the prefetch thread before the underlying file is closed.
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+        super().close()
 
     def __repr__(self):
         s = repr(self.fileobj)
         return '<igzip ' + s[1:-1] + ' ' + hex(id(self)) + '>'
 
     def _write_gzip_header(self, compresslevel=_COMPRESS_LEVEL_TRADEOFF):
-        # Python 3.9 added a `compresslevel` parameter to write gzip header.
-        # This only determines the value of one extra flag. Because this change
-        # was backported to 3.7 and 3.8 in later point versions, the attributes
-        # of the function should be checked before trying to use the
-        # compresslevel parameter.
         # The gzip header has an extra flag that can be set depending on the
         # compression level used. This should be set when either the fastest or
         # best method is used. ISAL level 0 is larger than gzip level 1 and
@@ -183,9 +284,7 @@ class IGzipFile(gzip.GzipFile):
         # ISAL level 1,2 and 3 (best)are similar in size and fall around the
         # gzip level 3 size. So setting no extra flag
         # (by using COMPRESS_LEVEL_TRADEOFF) is appropriate here.
-        if ("compresslevel" in super()._write_gzip_header.__code__.co_varnames
-            and hasattr(gzip, "_COMPRESS_LEVEL_FAST")
-                and hasattr(gzip, "_COMPRESS_LEVEL_TRADEOFF")):
+        if _HEADER_HAS_COMPRESSLEVEL:
             if compresslevel == _COMPRESS_LEVEL_FAST:
                 super()._write_gzip_header(gzip._COMPRESS_LEVEL_FAST)
             else:
@@ -193,6 +292,24 @@ class IGzipFile(gzip.GzipFile):
         else:
             super()._write_gzip_header()
 
+    @property
+    def offset(self):
+        # In write mode the file offset always equals the number of
+        # uncompressed bytes written, so only the size is tracked.
+        return self.size
+
+    @offset.setter
+    def offset(self, value):
+        self.size = value
+
+    def readinto(self, b):
+        self._check_not_closed()
+        if self.mode != READ:
+            import errno
+            raise OSError(errno.EBADF,
+                          "readinto() on write-only IGzipFile object")
+        return self._buffer.readinto(b)
+
     def write(self, data):
         self._check_not_closed()
         if self.mode != WRITE:
@@ -202,7 +319,7 @@ class IGzipFile(gzip.GzipFile):
         if self.fileobj is None:
             raise ValueError("write() on closed IGzipFile object")
 
-        if isinstance(data, bytes):
+        if isinstance(data, (bytes, bytearray)):
             length = len(data)
         else:
             # accept any data that supports the buffer protocol
@@ -210,13 +327,154 @@ class IGzipFile(gzip.GzipFile):
             length = data.nbytes
 
         if length > 0:
-            self.fileobj.write(self.compress.compress(data))
+            compressed, self.crc = self.compress._compress_and_crc(data,
+                                                                   self.crc)
+            self.fileobj.write(compressed)
             self.size += length
-            self.crc = isal_zlib.crc32(data, self.crc)
-            self.offset += length
         return length
 
 
+def _read_buffer_size(fp) -> int:
+    """Select a read buffer size that suits the file underlying fp."""
+    try:
+        st = os.fstat(fp.fileno())
+    except (AttributeError, OSError, ValueError):
+        # Not backed by a file descriptor, such as io.BytesIO.
+        return READ_BUFFER_SIZE
+    if stat.S_ISFIFO(st.st_mode) or stat.S_ISSOCK(st.st_mode):
+        return _PIPE_READ_BUFFER_SIZE
+    if stat.S_ISREG(st.st_mode) and st.st_size > _LARGE_FILE_SIZE:
+        return _LARGE_FILE_READ_BUFFER_SIZE
+    return READ_BUFFER_SIZE
+
+
+class _PrefetchReader(io.RawIOBase):
+    """
+    Read a binary file in a background thread.
+
+    The next block of compressed data is read from fp while the current block
+    is being decompressed. Since decompression happens outside the GIL, this
+    allows file I/O and decompression to overlap.
+    """
+    def __init__(self, fp, buffer_size=READ_BUFFER_SIZE, queue_size=2):
+        self.fp = fp
+        self.buffer_size = buffer_size
+        self.queue_size = queue_size
+        self._calling_thread = threading.current_thread()
+        self._closed = False
+        # The worker reads ahead, so the position in fp is not the position
+        # of the data handed out. Keep track of the latter.
+        try:
+            self.pos = fp.tell()
+        except (AttributeError, OSError):
+            self.pos = 0
+        self._start()
+
+    def _start(self):
+        self.queue = queue.Queue(self.queue_size)
+        self.buffer = io.BytesIO()
+        self.exception = None
+        self.running = True
+        self.worker = threading.Thread(target=self._read)
+        self.worker.start()
+
+    def _stop(self):
+        self.running = False
+        # Make room in the queue, so a worker waiting to put a block does not
+        # have to wait for its timeout before it notices it should stop.
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        self.worker.join()
+
+    def _read(self):
+        fp = self.fp
+        block_size = self.buffer_size
+        block_queue = self.queue
+        while self.running and self._calling_thread.is_alive():
+            try:
+                data = fp.read(block_size)
+            except Exception as e:
+                self.exception = e
+                data = b""
+            while self.running and self._calling_thread.is_alive():
+                try:
+                    block_queue.put(data, timeout=0.05)
+                    break
+                except queue.Full:
+                    pass
+            if not data:
+                return
+
+    def readinto(self, b):
+        if self._closed:
+            raise ValueError("I/O operation on closed file")
+        result = self.buffer.readinto(b)
+        if result == 0:
+            while True:
+                try:
+                    block = self.queue.get(timeout=0.05)
+                    break
+                except queue.Empty:
+                    if not self.worker.is_alive() and self.queue.empty():
+                        # The worker stopped without posting EOF, for
+                        # instance because the calling thread has exited.
+                        if self.exception:
+                            raise self.exception
+                        raise OSError("prefetch worker has stopped")
+            if not block:
+                # Keep returning EOF on subsequent reads.
+                self.queue.put(block)
+                if self.exception:
+                    raise self.exception
+                return 0
+            # BytesIO shares the bytes object until it is written to, so the
+            # block is not copied.
+            self.buffer = io.BytesIO(block)
+            result = self.buffer.readinto(b)
+        self.pos += result
+        return result
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self.fp.seekable()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if self._closed:
+            raise ValueError("I/O operation on closed file")
+        if whence == io.SEEK_CUR:
+            offset = self.pos + offset
+            whence = io.SEEK_SET
+        # The worker has read ahead, so the underlying position can only be
+        # restored by restarting the worker after seeking. Restart it even
+        # when seeking fails, so no blocks from before the seek are served.
+        self._stop()
+        try:
+            self.pos = self.fp.seek(offset, whence)
+        finally:
+            self._start()
+        return self.pos
+
+    def tell(self):
+        if self._closed:
+            raise ValueError("I/O operation on closed file")
+        return self.pos
+
+    def close(self):
+        if self._closed:
+            return
+        self._stop()
+        self._closed = True
+
+    @property
+    def closed(self):
+        return self._closed
+
+
 # Aliases for improved compatibility with CPython gzip module.
 GzipFile = IGzipFile
 _IGzipReader = _GzipReader
@@ -236,10 +494,10 @@ def compress(data, compresslevel: int = _COMPRESS_LEVEL_BEST, *,
     # fields added to header), mtime, xfl and os (255 for unknown OS).
     header = struct.pack("<BBBBLBB", 0x1f, 0x8b, 8, 0, int(mtime), xfl, 255)
     # use igzip_lib to compress the data without a gzip header but with a
-    # gzip trailer.
-    compressed = igzip_lib.compress(data, compresslevel,
-                                    flag=igzip_lib.COMP_GZIP_NO_HDR)
-    return header + compressed
+    # gzip trailer. The header is placed in front of the compressed data
+    # directly, so the output does not need to be copied.
+    return igzip_lib._compress_with_header(data, header, compresslevel,
+                                           flag=igzip_lib.COMP_GZIP_NO_HDR)
 
 
 def decompress(data):
@@ -255,6 +513,17 @@ def decompress(data):
 
 
 def _argument_parser():
+    # argparse is only needed for the command line interface. Importing it
+    # lazily keeps 'import isal.igzip' fast.
+    import argparse
+
+    def positive_int(value):
+        number = int(value)
+        if number < 1:
+            raise argparse.ArgumentTypeError(
+                f"must be a positive integer, got {value}")
+        return number
+
     parser = argparse.ArgumentParser()
     parser.description = (
         "A simple command line interface for the igzip module. "
@@ -298,11 +567,29 @@ def _argument_parser():
     parser.add_argument("-b", "--buffer-size",
                         default=READ_BUFFER_SIZE, type=int,
                         help=argparse.SUPPRESS)
+    parser.add_argument("--ibuf-size", type=positive_int, dest="ibuf_size",
+                        help="Size of the compressed input buffer. Only "
+                             "applies to decompression (-d). Chosen "
+                             "automatically by default.")
     return parser
 
 
+def _copy_file(in_file, out_file, buffer_size):
+    """Copy in_file to out_file using a single preallocated buffer."""
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    while True:
+        size = in_file.readinto(view)
+        if not size:
+            break
+        out_file.write(view[:size])
+
+
 def main():
-    args = _argument_parser().parse_args()
+    parser = _argument_parser()
+    args = parser.parse_args()
+    if args.compress and args.ibuf_size is not None:
+        parser.error("--ibuf-size can only be used when decompressing")
 
     compresslevel = args.compresslevel or _COMPRESS_LEVEL_TRADEOFF
 
@@ -332,7 +619,9 @@ def main():
         if args.file is None:
             in_file = sys.stdin.buffer
         else:
-            in_file = builtins.open(args.file, mode="rb")
+            # The input is read in large blocks by _copy_file, so a raw
+            # FileIO avoids an unnecessary BufferedReader layer.
+            in_file = io.FileIO(args.file, mode="rb")
         if out_filepath is not None:
             out_buffer = builtins.open(out_filepath, "wb")
         else:
@@ -346,16 +635,18 @@ def main():
                              compresslevel=compresslevel, **gzip_file_kwargs)
     else:
         if args.file:
-            in_file = open(args.file, mode="rb")
+            in_file = IGzipFile(args.file, mode="rb",
+                                buffer_size=args.ibuf_size)
         else:
-            in_file = IGzipFile(mode="rb", fileobj=sys.stdin.buffer)
+            in_file = IGzipFile(mode="rb", fileobj=sys.stdin.buffer,
+                                buffer_size=args.ibuf_size)
         if out_filepath is not None:
             out_file = builtins.open(out_filepath, mode="wb")
         else:
             out_file = sys.stdout.buffer
 
     try:
-        shutil.copyfileobj(in_file, out_file, args.buffer_size)
+        _copy_file(in_file, out_file, args.buffer_size)
     finally:
         if in_file is not sys.stdin.buffer:
             in_file.close()
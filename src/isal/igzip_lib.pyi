@@ -40,6 +40,10 @@ def compress(__data,
              flag: int = COMP_DEFLATE,
              mem_level: int = MEM_LEVEL_DEFAULT,
              hist_bits: int = MAX_HIST_BITS) -> bytes: ...
+def _compress_with_header(__data,
+                          __header,
+                          level: int = ISAL_DEFAULT_COMPRESSION,
+                          flag: int = COMP_DEFLATE) -> bytes: ...
 def decompress(__data,
                flag: int = DECOMP_DEFLATE,
                hist_bits: int = MAX_HIST_BITS,
@@ -329,11 +329,56 @@ igzip_lib_compress(PyObject *module, PyObject *args, PyObject *kwargs)
         return NULL;
     }
     PyObject *return_value = igzip_lib_compress_impl(
-        &data, level, flag, mem_level, hist_bits);
+        &data, level, flag, mem_level, hist_bits, NULL, 0);
     PyBuffer_Release(&data);
     return return_value;
 }
 
+PyDoc_STRVAR(igzip_lib__compress_with_header__doc__,
+"_compress_with_header($module, data, header, /,\n"
+"                      level=ISAL_DEFAULT_COMPRESSION, flag=COMP_DEFLATE)\n"
+"--\n"
+"\n"
+"Like compress, but the returned bytes object starts with header.\n"
+"\n"
+"  data\n"
+"    Binary data to be compressed.\n"
+"  header\n"
+"    Bytes placed before the compressed data.\n"
+"  level\n"
+"    Compression level, in 0-3.\n"
+"  flag\n"
+"    Controls which header and trailer are used.");
+
+#define IGZIP_LIB__COMPRESS_WITH_HEADER_METHODDEF    \
+    {"_compress_with_header", \
+     (PyCFunction)(void(*)(void))igzip_lib__compress_with_header, \
+     METH_VARARGS|METH_KEYWORDS, igzip_lib__compress_with_header__doc__}
+
+static PyObject *
+igzip_lib__compress_with_header(PyObject *module, PyObject *args,
+                                PyObject *kwargs)
+{
+    static char *keywords[] = {"", "", "level", "flag", NULL};
+    static char *format ="y*y*|ii:_compress_with_header";
+    Py_buffer data = {NULL, NULL};
+    Py_buffer header = {NULL, NULL};
+    int level = ISAL_DEFAULT_COMPRESSION;
+    int flag = COMP_DEFLATE;
+
+    if (!PyArg_ParseTupleAndKeywords(
+            args, kwargs, format, keywords,
+            &data, &header, &level, &flag)) {
+        return NULL;
+    }
+    PyObject *return_value = igzip_lib_compress_impl(
+        &data, level, flag, MEM_LEVEL_DEFAULT, ISAL_DEF_MAX_HIST_BITS,
+        header.buf, header.len);
+    PyBuffer_Release(&data);
+    PyBuffer_Release(&header);
+    return return_value;
+}
+
 PyDoc_STRVAR(igzip_lib_decompress__doc__,
 "decompress($module, data, /, flag=DECOMP_DEFLATE, hist_bits=MAX_HIST_BITS,\n"
 "           bufsize=DEF_BUF_SIZE)\n"
@@ -461,6 +506,7 @@ igzip_lib_IgzipDecompressor__new__(PyTypeObject *type,
     self->avail_in_real = 0;
     self->input_buffer = NULL;
     self->input_buffer_size = 0;
+    Py_XINCREF(zdict);
     self->zdict = zdict;
     self->unused_data = PyBytes_FromStringAndSize(NULL, 0);
     if (self->unused_data == NULL) {
@@ -529,6 +575,7 @@ static PyTypeObject IgzipDecompressor_Type = {
 
 static PyMethodDef IgzipLibMethods[] = {
     IGZIP_LIB_COMPRESS_METHODDEF,
+    IGZIP_LIB__COMPRESS_WITH_HEADER_METHODDEF,
     IGZIP_LIB_DECOMPRESS_METHODDEF,
     {NULL, NULL, 0, NULL}        /* Sentinel */
 };
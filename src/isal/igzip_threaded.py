@@ -17,6 +17,7 @@ from typing import List, Optional, Tuple
 from . import igzip, isal_zlib
 
 DEFLATE_WINDOW_SIZE = 2 ** 15
+_EMPTY_LAST_BLOCK = isal_zlib.compress(b"", wbits=-15)
 
 
 def open(filename, mode="rb", compresslevel=igzip._COMPRESS_LEVEL_TRADEOFF,
@@ -116,15 +117,16 @@ class _ThreadedGzipReader(io.RawIOBase):
                 data = self.fileobj.read(block_size)
             except Exception as e:
                 self.exception = e
-                return
-            if not data:
-                return
+                data = b""
+            # An empty block signals EOF or an exception to readinto.
             while self.running and self._calling_thread.is_alive():
                 try:
                     block_queue.put(data, timeout=0.05)
                     break
                 except queue.Full:
                     pass
+            if not data:
+                return
 
     def readinto(self, b):
         self._check_closed()
@@ -132,14 +134,21 @@ class _ThreadedGzipReader(io.RawIOBase):
         if result == 0:
             while True:
                 try:
-                    data_from_queue = self.queue.get(timeout=0.01)
+                    data_from_queue = self.queue.get(timeout=0.05)
                     break
                 except queue.Empty:
-                    if not self.worker.is_alive():
+                    if not self.worker.is_alive() and self.queue.empty():
+                        # The worker stopped without posting EOF, for
+                        # instance because the calling thread has exited.
                         if self.exception:
                             raise self.exception
-                        # EOF reached
-                        return 0
+                        raise OSError("decompression worker has stopped")
+            if not data_from_queue:
+                # Keep returning EOF on subsequent reads.
+                self.queue.put(data_from_queue)
+                if self.exception:
+                    raise self.exception
+                return 0
             self.buffer = io.BytesIO(data_from_queue)
             result = self.buffer.readinto(b)
         self.pos += result
@@ -156,6 +165,13 @@ class _ThreadedGzipReader(io.RawIOBase):
         if self._closed:
             return
         self.running = False
+        # Make room in the queue, so a worker waiting to put a block does not
+        # have to wait for its timeout before it notices the reader closed.
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
         self.worker.join()
         self.fileobj.close()
         if self.closefd:
@@ -191,9 +207,10 @@ class _ThreadedGzipWriter(io.RawIOBase):
     buffer. Using the bytes constructor this is made into an immutable block of
     data.
 
-    A reference to the previous block is used to create a memoryview of the
-    last 32k of that block. This is used as a dictionary for the compression
-    allowing for better compression rates.
+    A copy of the last 32k of the previous block is kept. This is used as a
+    dictionary for the compression allowing for better compression rates.
+    Only keeping the last 32k means the previous block itself can be freed
+    as soon as it is compressed.
 
     The current block and the dictionary are pushed into an input queue. They
     are picked up by a compression worker that calculates the crc32, the
@@ -225,7 +242,18 @@ class _ThreadedGzipWriter(io.RawIOBase):
         self._calling_thread = threading.current_thread()
         self.exception: Optional[Exception] = None
         self.level = level
-        self.previous_block = b""
+        # The header only depends on the level, so it is the same for every
+        # gzip member that is written.
+        magic1 = 0x1f
+        magic2 = 0x8b
+        method = 0x08
+        flags = 0
+        mtime = 0
+        xfl = 4 if level == 0 else 0
+        os = 0xff
+        self._gzip_header = struct.pack(
+            "<BBBBIBB", magic1, magic2, method, flags, mtime, xfl, os)
+        self.previous_window = b""
         # Deflating random data results in an output a little larger than the
         # input. Making the output buffer 10% larger is sufficient overkill.
         compress_buffer_size = block_size + max(block_size // 10, 500)
@@ -235,7 +263,7 @@ class _ThreadedGzipWriter(io.RawIOBase):
                                         level=level) for _ in range(threads)
         ]
         if threads > 1:
-            self.input_queues: List[queue.Queue[Tuple[bytes, memoryview]]] = [
+            self.input_queues: List[queue.Queue[Tuple[bytes, bytes]]] = [
                 queue.Queue(queue_size) for _ in range(threads)]
             self.output_queues: List[queue.Queue[Tuple[bytes, int, int]]] = [
                 queue.Queue(queue_size) for _ in range(threads)]
@@ -268,15 +296,7 @@ class _ThreadedGzipWriter(io.RawIOBase):
 
     def _write_gzip_header(self):
         """Simple gzip header. Only xfl flag is set according to level."""
-        magic1 = 0x1f
-        magic2 = 0x8b
-        method = 0x08
-        flags = 0
-        mtime = 0
-        os = 0xff
-        xfl = 4 if self.level == 0 else 0
-        self.raw.write(struct.pack(
-            "BBBBIBB", magic1, magic2, method, flags, mtime, os, xfl))
+        self.raw.write(self._gzip_header)
 
     def start(self):
         self.running = True
@@ -287,6 +307,13 @@ class _ThreadedGzipWriter(io.RawIOBase):
     def stop(self):
         """Stop, but do not care for remaining work"""
         self.running = False
+        # Wake up the workers with a None item, so they do not have to wait
+        # for their queue timeout before they notice they should stop.
+        for q in self.input_queues + self.output_queues:
+            try:
+                q.put_nowait(None)
+            except queue.Full:
+                pass
         for worker in self.compression_workers:
             worker.join()
         self.output_worker.join()
@@ -309,8 +336,8 @@ class _ThreadedGzipWriter(io.RawIOBase):
             return total_written
         data = bytes(b)
         index = self.index
-        zdict = memoryview(self.previous_block)[-DEFLATE_WINDOW_SIZE:]
-        self.previous_block = data
+        zdict = self.previous_window
+        self.previous_window = data[-DEFLATE_WINDOW_SIZE:]
         self.index += 1
         worker_index = index % self.threads
         self.input_queues[worker_index].put((data, zdict))
@@ -324,12 +351,14 @@ class _ThreadedGzipWriter(io.RawIOBase):
         # Wait for all data to be written
         for out_q in self.output_queues:
             out_q.join()
-        # Write an empty deflate block with a lost block marker.
-        self.raw.write(isal_zlib.compress(b"", wbits=-15))
-        trailer = struct.pack("<II", self._crc, self._size & 0xFFFFFFFF)
-        self.raw.write(trailer)
+        # Write an empty deflate block with a last block marker, followed by
+        # the trailer, in a single write.
+        self.raw.write(_EMPTY_LAST_BLOCK +
+                       struct.pack("<II", self._crc, self._size & 0xFFFFFFFF))
         self._crc = 0
         self._size = 0
+        # The next member can not refer back to data in this member.
+        self.previous_window = b""
         self.raw.flush()
 
     def flush(self):
@@ -359,11 +388,15 @@ class _ThreadedGzipWriter(io.RawIOBase):
         compressor: isal_zlib._ParallelCompress = self.compressors[index]
         while True:
             try:
-                data, zdict = in_queue.get(timeout=0.05)
+                item = in_queue.get(timeout=0.05)
             except queue.Empty:
                 if not (self.running and self._calling_thread.is_alive()):
                     return
                 continue
+            if item is None:
+                in_queue.task_done()
+                return
+            data, zdict = item
             try:
                 compressed, crc = compressor.compress_and_crc(data, zdict)
             except Exception as e:
@@ -381,11 +414,15 @@ class _ThreadedGzipWriter(io.RawIOBase):
             out_index = index % self.threads
             output_queue = output_queues[out_index]
             try:
-                compressed, crc, data_length = output_queue.get(timeout=0.05)
+                item = output_queue.get(timeout=0.05)
             except queue.Empty:
                 if not (self.running and self._calling_thread.is_alive()):
                     return
                 continue
+            if item is None:
+                output_queue.task_done()
+                return
+            compressed, crc, data_length = item
             self._crc = isal_zlib.crc32_combine(self._crc, crc, data_length)
             self._size += data_length
             self.raw.write(compressed)
@@ -399,11 +436,15 @@ class _ThreadedGzipWriter(io.RawIOBase):
         compressor = self.compressors[0]
         while True:
             try:
-                data, zdict = in_queue.get(timeout=0.05)
+                item = in_queue.get(timeout=0.05)
             except queue.Empty:
                 if not (self.running and self._calling_thread.is_alive()):
                     return
                 continue
+            if item is None:
+                in_queue.task_done()
+                return
+            data, zdict = item
             try:
                 compressed, crc = compressor.compress_and_crc(data, zdict)
             except Exception as e:
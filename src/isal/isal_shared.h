@@ -274,12 +274,17 @@ arrange_output_buffer(uint32_t *avail_out,
     return ret;
 }
 
+/* When header is not NULL, header_len bytes of it are placed at the start
+   of the output. This avoids copying the compressed data into a new bytes
+   object to prepend a header. */
 static PyObject *
 igzip_lib_compress_impl(Py_buffer *data,
                         int level,
                         int flag,
                         int mem_level,
-                        int hist_bits)
+                        int hist_bits,
+                        const uint8_t *header,
+                        Py_ssize_t header_len)
 {
     PyObject *RetVal = NULL;
     uint8_t *ibuf;
@@ -309,6 +314,20 @@ igzip_lib_compress_impl(Py_buffer *data,
 
     zst.next_in = ibuf;
 
+    if (header != NULL) {
+        obuflen = Py_MAX(obuflen, header_len);
+        obuflen = arrange_output_buffer(&(zst.avail_out), &(zst.next_out),
+                                        &RetVal, obuflen);
+        if (obuflen < 0) {
+            PyErr_SetString(PyExc_MemoryError,
+                    "Unsufficient memory for buffer allocation");
+            goto error;
+        }
+        memcpy(zst.next_out, header, header_len);
+        zst.next_out += header_len;
+        zst.avail_out -= header_len;
+    }
+
     do {
         arrange_input_buffer(&(zst.avail_in), &ibuflen);
         if (ibuflen == 0){
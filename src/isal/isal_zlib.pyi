@@ -51,6 +51,7 @@ def decompress(__data,
 
 class Compress:
     def compress(self, __data) -> bytes: ...
+    def _compress_and_crc(self, __data, __crc: int) -> typing.Tuple[bytes, int]: ...
     def flush(self, mode: int = Z_FINISH) -> bytes: ...
 
 class Decompress:
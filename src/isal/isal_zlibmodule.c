@@ -293,11 +293,15 @@ typedef struct {
     uint8_t *buffer;
     uint32_t buffer_size;
     struct isal_zstream zst;
+    PyThread_type_lock lock;
 } ParallelCompress;
 
 static void 
 ParallelCompress_dealloc(ParallelCompress *self)
 {
+    if (self->lock != NULL) {
+        PyThread_free_lock(self->lock);
+    }
     PyMem_Free(self->buffer);
     PyMem_Free(self->zst.level_buf);
     Py_TYPE(self)->tp_free((PyObject *)self);
@@ -330,6 +334,12 @@ ParallelCompress__new__(PyTypeObject *type, PyObject *args, PyObject *kwargs)
     }
     self->buffer = NULL;
     self->zst.level_buf = NULL;
+    self->lock = PyThread_allocate_lock();
+    if (self->lock == NULL) {
+        Py_DECREF(self);
+        PyErr_SetString(PyExc_MemoryError, "Unable to allocate lock");
+        return NULL;
+    }
     isal_deflate_init(&self->zst);
     uint8_t *level_buf = PyMem_Malloc(level_buf_size);
     if (level_buf == NULL) {
@@ -400,6 +410,7 @@ ParallelCompress_compress_and_crc(ParallelCompress *self,
                      "Can only compress %d bytes of data", UINT32_MAX);
         goto error;
     }
+    ENTER_ZLIB(self);
     PyThreadState *_save;
     Py_UNBLOCK_THREADS
     isal_deflate_reset(&self->zst);
@@ -411,21 +422,21 @@ ParallelCompress_compress_and_crc(ParallelCompress *self,
     if (err != 0){
         Py_BLOCK_THREADS;
         isal_deflate_error(err);
-        goto error;
+        goto unlock_error;
     }
     err = isal_deflate(&self->zst);
     Py_BLOCK_THREADS;
 
     if (err != COMP_OK) {
         isal_deflate_error(err);
-        goto error;
+        goto unlock_error;
     }
     if (self->zst.avail_out == 0) {
         PyErr_Format(
             PyExc_OverflowError,
             "Compressed output exceeds buffer size of %u", self->buffer_size
         );
-        goto error;
+        goto unlock_error;
     }
     if (self->zst.avail_in != 0) {
         PyErr_Format(
@@ -434,12 +445,13 @@ ParallelCompress_compress_and_crc(ParallelCompress *self,
             "Please contact the developers by creating an issue at "
             "https://github.com/pycompression/python-isal/issues", 
             self->zst.avail_in);
-        goto error;
+        goto unlock_error;
     }
     PyObject *out_tup = PyTuple_New(2);
     PyObject *crc_obj = PyLong_FromUnsignedLong(self->zst.internal_state.crc);
     PyObject *out_bytes = PyBytes_FromStringAndSize(
         (char *)self->buffer, self->zst.next_out - self->buffer);
+    LEAVE_ZLIB(self);
     if (out_bytes == NULL || out_tup == NULL || crc_obj == NULL) {
         Py_XDECREF(out_bytes); Py_XDECREF(out_tup); Py_XDECREF(crc_obj);
         goto error;
@@ -449,6 +461,8 @@ ParallelCompress_compress_and_crc(ParallelCompress *self,
     PyTuple_SET_ITEM(out_tup, 0, out_bytes);
     PyTuple_SET_ITEM(out_tup, 1, crc_obj);
     return out_tup;
+unlock_error:
+    LEAVE_ZLIB(self);
 error:
     PyBuffer_Release(&data);
     PyBuffer_Release(&zdict); 
@@ -509,7 +523,7 @@ isal_zlib_compress(PyObject *module, PyObject *args, PyObject *kwargs)
         return NULL;
     }
     PyObject *return_value = igzip_lib_compress_impl(
-        &data, level, flag, MEM_LEVEL_DEFAULT, hist_bits);
+        &data, level, flag, MEM_LEVEL_DEFAULT, hist_bits, NULL, 0);
     PyBuffer_Release(&data);
     return return_value;
 }
@@ -817,8 +831,13 @@ isal_zlib_decompressobj_impl(PyObject *module, int wbits, PyObject *zdict)
     return (PyObject *)self;
 }
 
+/* Input is processed in blocks of this size when a checksum is requested, so
+   the checksum is calculated while the block is still in the CPU cache. */
+#define COMPRESS_CRC_BLOCK_SIZE (64 * 1024)
+
 static PyObject *
-isal_zlib_Compress_compress_impl(compobject *self, Py_buffer *data)
+isal_zlib_Compress_compress_impl(compobject *self, Py_buffer *data, 
+                                 uint32_t *crc)
 /*[clinic end generated code: output=5d5cd791cbc6a7f4 input=0d95908d6e64fab8]*/
 {
     PyObject *RetVal = NULL;
@@ -831,7 +850,15 @@ isal_zlib_Compress_compress_impl(compobject *self, Py_buffer *data)
     ibuflen = data->len;
 
     do {
-        arrange_input_buffer(&(self->zst.avail_in), &ibuflen);
+        if (crc == NULL) {
+            arrange_input_buffer(&(self->zst.avail_in), &ibuflen);
+        } else {
+            self->zst.avail_in = (uint32_t)Py_MIN(ibuflen, 
+                                                  COMPRESS_CRC_BLOCK_SIZE);
+            ibuflen -= self->zst.avail_in;
+        }
+        uint8_t *block_start = self->zst.next_in;
+        uint32_t block_size = self->zst.avail_in;
         do {
             obuflen = arrange_output_buffer(&(self->zst.avail_out),
                                             &(self->zst.next_out), &RetVal, obuflen);
@@ -839,6 +866,10 @@ isal_zlib_Compress_compress_impl(compobject *self, Py_buffer *data)
                 goto error;
 
             Py_BEGIN_ALLOW_THREADS
+            if (crc != NULL && block_size != 0) {
+                *crc = crc32_gzip_refl(*crc, block_start, block_size);
+                block_size = 0;
+            }
             err = isal_deflate(&self->zst);
             Py_END_ALLOW_THREADS
 
@@ -1267,11 +1298,75 @@ isal_zlib_Compress_compress(compobject *self, PyObject *data)
     if (PyObject_GetBuffer(data, &data_buf, PyBUF_SIMPLE) < 0) {
         return NULL;
     }
-    PyObject *return_value = isal_zlib_Compress_compress_impl(self, &data_buf);
+    PyObject *return_value = isal_zlib_Compress_compress_impl(
+        self, &data_buf, NULL);
     PyBuffer_Release(&data_buf);
     return return_value;
 }
 
+PyDoc_STRVAR(isal_zlib_Compress__compress_and_crc__doc__,
+"_compress_and_crc($self, data, crc, /)\n"
+"--\n"
+"\n"
+"Returns a tuple of the compressed data and the updated CRC-32 checksum.\n"
+"\n"
+"  data\n"
+"    Binary data to be compressed.\n"
+"  crc\n"
+"    Starting value of the checksum.\n"
+"\n"
+"Equivalent to (compress(data), crc32(data, crc)), but the checksum is\n"
+"calculated blockwise during compression, so the data is only read from\n"
+"memory once.");
+
+#define ISAL_ZLIB_COMPRESS__COMPRESS_AND_CRC_METHODDEF    \
+    {"_compress_and_crc", \
+     (PyCFunction)(void(*)(void))isal_zlib_Compress__compress_and_crc, \
+     METH_FASTCALL, isal_zlib_Compress__compress_and_crc__doc__}
+
+static PyObject *
+isal_zlib_Compress__compress_and_crc(compobject *self, 
+                                     PyObject *const *args, 
+                                     Py_ssize_t nargs)
+{
+    if (nargs != 2) {
+        PyErr_Format(
+            PyExc_TypeError, 
+            "_compress_and_crc takes exactly 2 arguments, got %zd", 
+            nargs);
+        return NULL;
+    }
+    Py_buffer data_buf;
+    if (PyObject_GetBuffer(args[0], &data_buf, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+    uint32_t crc = (uint32_t)PyLong_AsUnsignedLongMask(args[1]);
+    if (crc == (uint32_t)-1 && PyErr_Occurred()) {
+        PyBuffer_Release(&data_buf);
+        return NULL;
+    }
+    PyObject *compressed = isal_zlib_Compress_compress_impl(
+        self, &data_buf, &crc);
+    PyBuffer_Release(&data_buf);
+    if (compressed == NULL) {
+        return NULL;
+    }
+    PyObject *crc_obj = PyLong_FromUnsignedLong(crc);
+    if (crc_obj == NULL) {
+        Py_DECREF(compressed);
+        return NULL;
+    }
+    PyObject *out_tup = PyTuple_New(2);
+    if (out_tup == NULL) {
+        Py_DECREF(compressed);
+        Py_DECREF(crc_obj);
+        return NULL;
+    }
+    PyTuple_SET_ITEM(out_tup, 0, compressed);
+    PyTuple_SET_ITEM(out_tup, 1, crc_obj);
+    return out_tup;
+}
+
 PyDoc_STRVAR(isal_zlib_Decompress_decompress__doc__,
 "decompress($self, data, /, max_length=0)\n"
 "--\n"
@@ -1408,6 +1503,7 @@ isal_zlib_Decompress_flush(decompobject *self, PyObject *const *args, Py_ssize_t
 
 static PyMethodDef comp_methods[] = {
     ISAL_ZLIB_COMPRESS_COMPRESS_METHODDEF,
+    ISAL_ZLIB_COMPRESS__COMPRESS_AND_CRC_METHODDEF,
     ISAL_ZLIB_COMPRESS_FLUSH_METHODDEF,
     {NULL, NULL}
 };
@@ -1461,6 +1557,11 @@ static PyTypeObject IsalZlibDecompType = {
 #define GzipReader_TRAILER 3
 #define GzipReader_NULL_BYTES 4
 
+/* A 10 byte header, an empty deflate block and an 8 byte trailer. */
+#define GZIP_MIN_MEMBER_SIZE 20
+/* Deflate cannot compress data more than 1032 times. */
+#define DEFLATE_MAX_RATIO 1032
+
 typedef struct _GzipReaderStruct {
     PyObject_HEAD
     uint8_t *input_buffer;
@@ -1643,12 +1744,31 @@ static inline uint32_t load_u32_le(void *address) {
 static inline uint16_t load_u16_le(void *address) {
     #if PY_BIG_ENDIAN
     uint8_t *mem = address;
-    return mem[0] | (mem[1] << 8) | (mem[2] << 16) | (mem[3] << 24);
+    return mem[0] | (mem[1] << 8);
     #else
     return *(uint16_t *)address;
     #endif
 }
 
+/* Return a pointer to the first non-zero byte in [start, end) or end if all 
+   bytes are zero. Checks 8 bytes at a time, as padding between members can
+   be quite large. */
+static inline uint8_t *skip_null_bytes(uint8_t *start, uint8_t *end) {
+    uint8_t *cursor = start;
+    while (end - cursor >= (Py_ssize_t)sizeof(uint64_t)) {
+        uint64_t word;
+        memcpy(&word, cursor, sizeof(uint64_t));
+        if (word != 0) {
+            break;
+        }
+        cursor += sizeof(uint64_t);
+    }
+    while (cursor < end && *cursor == 0) {
+        cursor += 1;
+    }
+    return cursor;
+}
+
 static Py_ssize_t 
 GzipReader_read_into_buffer(GzipReader *self, uint8_t *out_buffer, size_t out_buffer_size)
 {
@@ -1809,9 +1929,7 @@ GzipReader_read_into_buffer(GzipReader *self, uint8_t *out_buffer, size_t out_bu
                     self->stream_phase = GzipReader_NULL_BYTES;
                 case GzipReader_NULL_BYTES:
                     // There maybe NULL bytes between gzip members
-                    while (current_pos < buffer_end && *current_pos == 0) {
-                        current_pos += 1;
-                    }
+                    current_pos = skip_null_bytes(current_pos, buffer_end);
                     if (current_pos == buffer_end) {
                         /* Not all NULL bytes may have been read, refresh the buffer.*/
                         break;
@@ -1864,16 +1982,11 @@ GzipReader_readinto(GzipReader *self, PyObject *buffer_obj)
     return PyLong_FromSsize_t((Py_ssize_t)written_size);
 }
 
-static PyObject *
-GzipReader_seek(GzipReader *self, PyObject *args, PyObject *kwargs) 
+/* Seek to offset. Must be called with the reader's lock held. Returns the
+   new position, or -1 with an exception set. */
+static int64_t
+GzipReader_seek_locked(GzipReader *self, Py_ssize_t offset, Py_ssize_t whence)
 {
-    Py_ssize_t offset;
-    Py_ssize_t whence = SEEK_SET;
-    static char *keywords[] = {"offset", "whence", NULL};
-    static char format[] = {"n|n:GzipReader.seek"};
-    if (PyArg_ParseTupleAndKeywords(args, kwargs, format, keywords, &offset, &whence) < 0) {
-        return NULL;
-    }
     // Recalculate offset as an absolute file position.
     if (whence == SEEK_SET) {
         ;
@@ -1885,7 +1998,8 @@ GzipReader_seek(GzipReader *self, PyObject *args, PyObject *kwargs)
             size_t tmp_buffer_size = 8 * 1024;
             uint8_t *tmp_buffer = PyMem_Malloc(tmp_buffer_size);
             if (tmp_buffer == NULL) {
-                return PyErr_NoMemory();
+                PyErr_NoMemory();
+                return -1;
             }
             while (1) {
                 /* Simply overwrite the tmp buffer over and over */
@@ -1894,7 +2008,7 @@ GzipReader_seek(GzipReader *self, PyObject *args, PyObject *kwargs)
                 );
                 if (written_bytes < 0) {
                     PyMem_FREE(tmp_buffer);
-                    return NULL;
+                    return -1;
                 }
                 if (written_bytes == 0) {
                     break;
@@ -1909,15 +2023,16 @@ GzipReader_seek(GzipReader *self, PyObject *args, PyObject *kwargs)
             PyExc_ValueError,
             "Invalid format for whence: %zd", whence
         );
-        return NULL;
+        return -1;
     }
 
     // Make it so that offset is the number of bytes to skip forward.
     if (offset < self->_pos) {
         PyObject *seek_result = PyObject_CallMethod(self->fp, "seek", "n", 0);
         if (seek_result == NULL) {
-            return NULL;
+            return -1;
         }
+        Py_DECREF(seek_result);
         self->stream_phase = GzipReader_HEADER;
         self->_pos = 0;
         self->all_bytes_read = 0;
@@ -1931,14 +2046,15 @@ GzipReader_seek(GzipReader *self, PyObject *args, PyObject *kwargs)
         Py_ssize_t tmp_buffer_size = 8 * 1024;
         uint8_t *tmp_buffer = PyMem_Malloc(tmp_buffer_size);
         if (tmp_buffer == NULL) {
-            return PyErr_NoMemory();
+            PyErr_NoMemory();
+            return -1;
         }
         while (offset > 0) {
             Py_ssize_t bytes_written = GzipReader_read_into_buffer(
                 self, tmp_buffer, Py_MIN(tmp_buffer_size, offset));
             if (bytes_written < 0) {
                 PyMem_FREE(tmp_buffer);
-                return NULL;
+                return -1;
             }
             if (bytes_written == 0) {
                 break;
@@ -1947,7 +2063,26 @@ GzipReader_seek(GzipReader *self, PyObject *args, PyObject *kwargs)
         }
         PyMem_Free(tmp_buffer);
     }
-    return PyLong_FromLongLong(self->_pos);
+    return self->_pos;
+}
+
+static PyObject *
+GzipReader_seek(GzipReader *self, PyObject *args, PyObject *kwargs) 
+{
+    Py_ssize_t offset;
+    Py_ssize_t whence = SEEK_SET;
+    static char *keywords[] = {"offset", "whence", NULL};
+    static char format[] = {"n|n:GzipReader.seek"};
+    if (PyArg_ParseTupleAndKeywords(args, kwargs, format, keywords, &offset, &whence) < 0) {
+        return NULL;
+    }
+    ENTER_ZLIB(self);
+    int64_t pos = GzipReader_seek_locked(self, offset, whence);
+    LEAVE_ZLIB(self);
+    if (pos < 0) {
+        return NULL;
+    }
+    return PyLong_FromLongLong(pos);
 }
 
 static PyObject *
@@ -1955,21 +2090,44 @@ GzipReader_readall(GzipReader *self, PyObject *Py_UNUSED(ignore))
 {
     /* Try to consume the entire buffer without too much overallocation */
     Py_ssize_t chunk_size = self->buffer_size * 4;
+    Py_ssize_t first_chunk_size = chunk_size;
+    if (self->memview != NULL && self->_pos == 0 &&
+        self->buffer_size >= GZIP_MIN_MEMBER_SIZE) {
+        /* For in-memory data that is read from the start, the ISIZE field
+           of the last trailer gives the decompressed size of a single member
+           stream. Allocating one more byte lets the read below signal the
+           end of the stream, so the data does not have to be joined from
+           several chunks. The hint is ignored when it exceeds the maximum
+           deflate compression ratio, or when it is smaller than the default
+           first chunk. The latter also covers zero padding after the last
+           member and multi-member input, where the last ISIZE only
+           describes the last member. The hint comes from the input, so it
+           is capped to avoid a large up-front allocation for crafted data;
+           larger streams are read in further chunks. */
+        uint32_t size_hint = load_u32_le(self->buffer_end - 4);
+        if ((uint64_t)size_hint >= (uint64_t)chunk_size &&
+                (uint64_t)size_hint <=
+                (uint64_t)self->buffer_size * DEFLATE_MAX_RATIO) {
+            first_chunk_size = Py_MAX(
+                chunk_size,
+                Py_MIN((Py_ssize_t)size_hint + 1, DEF_MAX_INITIAL_BUF_SIZE));
+        }
+    }
     /* Rather than immediately creating a list, read one chunk first and
        only create a list when more read operations are necessary. */
-    PyObject *first_chunk = PyBytes_FromStringAndSize(NULL, chunk_size);
+    PyObject *first_chunk = PyBytes_FromStringAndSize(NULL, first_chunk_size);
     if (first_chunk == NULL) {
         return NULL;
     }
     ENTER_ZLIB(self);
     Py_ssize_t written_size = GzipReader_read_into_buffer(
-        self, (uint8_t *)PyBytes_AS_STRING(first_chunk), chunk_size);
+        self, (uint8_t *)PyBytes_AS_STRING(first_chunk), first_chunk_size);
     LEAVE_ZLIB(self);
     if (written_size < 0) {
         Py_DECREF(first_chunk);
         return NULL;
     }
-    if (written_size < chunk_size) {
+    if (written_size < first_chunk_size) {
         if (_PyBytes_Resize(&first_chunk, written_size) < 0) {
             return NULL;
         }
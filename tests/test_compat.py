@@ -42,6 +42,17 @@ def test_crc32(data_size, value):
     assert zlib.crc32(data, value) == isal_zlib.crc32(data, value)
 
 
+@pytest.mark.parametrize("block_sizes", [[1000] * 5, [1000, 17, 1000, 17]])
+def test_crc32_combine(block_sizes):
+    crc = 0
+    start = 0
+    for block_size in block_sizes:
+        block = DATA[start:start + block_size]
+        crc = isal_zlib.crc32_combine(crc, zlib.crc32(block), len(block))
+        start += block_size
+    assert crc == zlib.crc32(DATA[:start])
+
+
 @pytest.mark.parametrize(["data_size", "value"],
                          itertools.product(DATA_SIZES, SEEDS))
 def test_adler32(data_size, value):
@@ -100,6 +111,18 @@ def test_compress_compressobj(data_size, level, wbits, memLevel):
     assert data == decompressed
 
 
+@pytest.mark.parametrize(["data_size", "value"],
+                         itertools.product(DATA_SIZES + [len(DATA)],
+                                           SEEDS[:8]))
+def test_compressobj_compress_and_crc(data_size, value):
+    data = DATA[:data_size]
+    compressobj = isal_zlib.compressobj(wbits=-15)
+    compressed, crc = compressobj._compress_and_crc(data, value)
+    compressed += compressobj.flush()
+    assert crc == zlib.crc32(data, value)
+    assert zlib.decompress(compressed, wbits=-15) == data
+
+
 @pytest.mark.parametrize(["data_size", "level", "wbits", "memLevel"],
                          itertools.product([128 * 1024], range(4),
                                            WBITS_RANGE, range(1, 10)))
@@ -24,6 +24,7 @@ import array
 import functools
 import gzip
 import io
+import itertools
 import os
 import pathlib
 import shutil
@@ -49,8 +50,6 @@ data2 = b"""/* zlibmodule.c -- igzip-compatible data compression */
 /* See http://www.winimage.com/zLibDll for Windows */
 """
 
-TEMPDIR = os.path.abspath(tempfile.mkdtemp(suffix='-gzdir'))
-
 
 class UnseekableIO(io.BytesIO):
     def seekable(self):
@@ -65,14 +64,20 @@ class UnseekableIO(io.BytesIO):
 
 class BaseTest(unittest.TestCase):
 
-    def __init__(self, methodName):
-        fileno, self.filename = tempfile.mkstemp()
-        os.close(fileno)
-        super().__init__(methodName)
+    @classmethod
+    def setUpClass(cls):
+        # One directory per class, rather than a temporary file for every
+        # test instance.
+        cls._tmpdir = tempfile.mkdtemp(suffix='-gzdir')
+        cls._counter = itertools.count()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls._tmpdir, ignore_errors=True)
 
     def setUp(self):
-        if os.path.exists(self.filename):
-            os.unlink(self.filename)
+        self.filename = os.path.join(self._tmpdir,
+                                     f"tmp{next(self._counter)}")
 
     def tearDown(self):
         if os.path.exists(self.filename):
@@ -80,6 +85,21 @@ class BaseTest(unittest.TestCase):
 
 
 class TestGzip(BaseTest):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The file that test_write produces, for tests that only need to
+        # read it back. It is written the same way, including the flush.
+        with io.BytesIO() as buffer:
+            with igzip.GzipFile('canned', 'wb', fileobj=buffer) as f:
+                f.write(data1 * 50)
+                f.flush()
+            cls._canned = buffer.getvalue()
+
+    def _write_canned(self):
+        with open(self.filename, 'wb') as f:
+            f.write(self._canned)
+
     def write_and_read_back(self, data, mode='b'):
         b_data = bytes(data)
         with igzip.GzipFile(self.filename, 'w' + mode) as f:
@@ -143,14 +163,14 @@ class TestGzip(BaseTest):
             self.assertEqual(f.read(), data1)
 
     def test_read(self):
-        self.test_write()
+        self._write_canned()
         # Try reading.
         with igzip.GzipFile(self.filename, 'r') as f:
             d = f.read()
         self.assertEqual(d, data1 * 50)
 
     def test_read1(self):
-        self.test_write()
+        self._write_canned()
         blocks = []
         nread = 0
         with igzip.GzipFile(self.filename, 'r') as f:
@@ -177,7 +197,7 @@ class TestGzip(BaseTest):
         # ValueError, just like the corresponding functions on file objects.
 
         # Write to a file, open it for reading, then close it.
-        self.test_write()
+        self._write_canned()
         f = igzip.GzipFile(self.filename, 'r')
         fileobj = f.fileobj
         self.assertFalse(fileobj.closed)
@@ -201,7 +221,7 @@ class TestGzip(BaseTest):
             f.flush()
 
     def test_append(self):
-        self.test_write()
+        self._write_canned()
         # Append to the previous file
         with igzip.GzipFile(self.filename, 'ab') as f:
             f.write(data2 * 15)
@@ -216,18 +236,15 @@ class TestGzip(BaseTest):
         # works.
         with igzip.GzipFile(self.filename, 'wb') as f:
             f.write(b'a')
-        for i in range(0, 200):
-            with igzip.GzipFile(self.filename, "ab") as f:  # append
-                f.write(b'a')
+        # Append each member through the same file descriptor.
+        with open(self.filename, "ab") as raw:
+            for i in range(0, 200):
+                with igzip.GzipFile(fileobj=raw, mode="ab") as f:  # append
+                    f.write(b'a')
 
         # Try reading the file
         with igzip.GzipFile(self.filename, "rb") as zgfile:
-            contents = b""
-            while 1:
-                ztxt = zgfile.read(8192)
-                contents += ztxt
-                if not ztxt:
-                    break
+            contents = zgfile.read()
         self.assertEqual(contents, b'a' * 201)
 
     def test_exclusive_write(self):
@@ -241,7 +258,7 @@ class TestGzip(BaseTest):
     def test_buffered_reader(self):
         # Issue #7471: a GzipFile can be wrapped in a BufferedReader for
         # performance.
-        self.test_write()
+        self._write_canned()
 
         with igzip.GzipFile(self.filename, 'rb') as f:
             with io.BufferedReader(f) as r:
@@ -250,7 +267,7 @@ class TestGzip(BaseTest):
         self.assertEqual(lines, 50 * data1.splitlines(keepends=True))
 
     def test_readline(self):
-        self.test_write()
+        self._write_canned()
         # Try .readline() with varying line lengths
 
         with igzip.GzipFile(self.filename, 'rb') as f:
@@ -263,7 +280,7 @@ class TestGzip(BaseTest):
                 line_length = (line_length + 1) % 50
 
     def test_readlines(self):
-        self.test_write()
+        self._write_canned()
         # Try .readlines()
 
         with igzip.GzipFile(self.filename, 'rb') as f:
@@ -276,7 +293,7 @@ class TestGzip(BaseTest):
                     break
 
     def test_seek_read(self):
-        self.test_write()
+        self._write_canned()
         # Try seek, read test
 
         with igzip.GzipFile(self.filename) as f:
@@ -296,7 +313,7 @@ class TestGzip(BaseTest):
                 f.seek(newpos)  # positive seek
 
     def test_seek_whence(self):
-        self.test_write()
+        self._write_canned()
         # Try seek(whence=1), read test
 
         with igzip.GzipFile(self.filename) as f:
@@ -313,7 +330,7 @@ class TestGzip(BaseTest):
                 f.write(b'GZ\n')
 
     def test_mode(self):
-        self.test_write()
+        self._write_canned()
         with igzip.GzipFile(self.filename, 'r') as f:
             self.assertEqual(f.myfileobj.mode, 'rb')
         os.unlink(self.filename)
@@ -327,7 +344,7 @@ class TestGzip(BaseTest):
                 self.assertEqual(f.name, self.filename)
 
     def test_paddedfile_getattr(self):
-        self.test_write()
+        self._write_canned()
         with igzip.GzipFile(self.filename, 'rb') as f:
             self.assertTrue(hasattr(f.fileobj, "name"))
             self.assertEqual(f.fileobj.name, self.filename)
@@ -520,7 +537,7 @@ class TestGzip(BaseTest):
     def test_textio_readlines(self):
         # Issue #10791: TextIOWrapper.readlines() fails when wrapping GzipFile.
         lines = (data1 * 50).decode("ascii").splitlines(keepends=True)
-        self.test_write()
+        self._write_canned()
         with igzip.GzipFile(self.filename, 'r') as f:
             with io.TextIOWrapper(f, encoding="ascii") as t:
                 self.assertEqual(t.readlines(), lines)
@@ -800,19 +817,17 @@ class TestOpen(BaseTest):
         assert text == data1
 
 
-def create_and_remove_directory(directory):
-    def decorator(function):
-        @functools.wraps(function)
-        def wrapper(*args, **kwargs):
-            os.makedirs(directory, exist_ok=True)
-            try:
-                return function(*args, **kwargs)
-            finally:
-                shutil.rmtree(directory)
-
-        return wrapper
+def create_and_remove_directory(function):
+    # Run the test with a new, private temporary directory in self.tempdir.
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        self.tempdir = tempfile.mkdtemp(suffix='-gzdir')
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            shutil.rmtree(self.tempdir)
 
-    return decorator
+    return wrapper
 
 
 class TestCommandLine(unittest.TestCase):
@@ -830,9 +845,9 @@ class TestCommandLine(unittest.TestCase):
         self.assertEqual(err, b'')
         self.assertEqual(out, self.data)
 
-    @create_and_remove_directory(TEMPDIR)
+    @create_and_remove_directory
     def test_decompress_infile_outfile(self):
-        igzipname = os.path.join(TEMPDIR, 'testigzip.gz')
+        igzipname = os.path.join(self.tempdir, 'testigzip.gz')
         self.assertFalse(os.path.exists(igzipname))
 
         with igzip.open(igzipname, mode='wb') as fp:
@@ -840,7 +855,7 @@ class TestCommandLine(unittest.TestCase):
         sys.argv = ['', '-d', igzipname]
         igzip.main()
 
-        with open(os.path.join(TEMPDIR, "testigzip"), "rb") as gunziped:
+        with open(os.path.join(self.tempdir, "testigzip"), "rb") as gunziped:
             self.assertEqual(gunziped.read(), self.data)
 
         self.assertTrue(os.path.exists(igzipname))
@@ -854,7 +869,7 @@ class TestCommandLine(unittest.TestCase):
         self.assertEqual(rc, 1)
         self.assertEqual(out, b'')
 
-    @create_and_remove_directory(TEMPDIR)
+    @create_and_remove_directory
     def test_compress_stdin_outfile(self):
         args = sys.executable, '-m', 'isal.igzip'
         with Popen(args, stdin=PIPE, stdout=PIPE, stderr=PIPE) as proc:
@@ -863,9 +878,9 @@ class TestCommandLine(unittest.TestCase):
         self.assertEqual(err, b'')
         self.assertEqual(out[:2], b"\x1f\x8b")
 
-    @create_and_remove_directory(TEMPDIR)
+    @create_and_remove_directory
     def test_compress_infile_outfile_default(self):
-        local_testigzip = os.path.join(TEMPDIR, 'testigzip')
+        local_testigzip = os.path.join(self.tempdir, 'testigzip')
         igzipname = local_testigzip + '.gz'
         self.assertFalse(os.path.exists(igzipname))
 
@@ -878,11 +893,11 @@ class TestCommandLine(unittest.TestCase):
         self.assertEqual(out, b'')
         self.assertEqual(err, b'')
 
-    @create_and_remove_directory(TEMPDIR)
+    @create_and_remove_directory
     def test_compress_infile_outfile(self):
         for compress_level in ('--fast', '--best'):
             with self.subTest(compress_level=compress_level):
-                local_testigzip = os.path.join(TEMPDIR, 'testigzip')
+                local_testigzip = os.path.join(self.tempdir, 'testigzip')
                 igzipname = local_testigzip + '.gz'
                 self.assertFalse(os.path.exists(igzipname))
 
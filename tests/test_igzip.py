@@ -99,7 +99,7 @@ def test_compress_stdin_stdout(capsysbinary, level):
 def test_decompress_infile_outfile(tmp_path, capsysbinary):
     test_file = tmp_path / "test"
     compressed_temp = test_file.with_suffix(".gz")
-    compressed_temp.write_bytes(gzip.compress(DATA))
+    compressed_temp.write_bytes(COMPRESSED_DATA)
     sys.argv = ['', '-d', str(compressed_temp)]
     igzip.main()
     out, err = capsysbinary.readouterr()
@@ -142,7 +142,7 @@ def test_decompress_infile_stdout_noerror(capsysbinary, tmp_path):
 
 def test_decompress_infile_stdout(capsysbinary, tmp_path):
     test_gz = tmp_path / "test.gz"
-    test_gz.write_bytes(gzip.compress(DATA))
+    test_gz.write_bytes(COMPRESSED_DATA)
     sys.argv = ['', '-cd', str(test_gz)]
     igzip.main()
     out, err = capsysbinary.readouterr()
@@ -162,7 +162,7 @@ def test_compress_infile_stdout(capsysbinary, tmp_path):
 
 def test_decompress_infile_out_file(tmp_path, capsysbinary):
     test_gz = tmp_path / "test.gz"
-    test_gz.write_bytes(gzip.compress(DATA))
+    test_gz.write_bytes(COMPRESSED_DATA)
     out_file = tmp_path / "out"
     sys.argv = ['', '-d', '-o', str(out_file), str(test_gz)]
     igzip.main()
@@ -274,6 +274,20 @@ def test_decompress_concatenated_with_nulls():
     assert igzip.decompress(data) == DATA + DATA
 
 
+@pytest.mark.parametrize("padding", [1, 7, 8, 9, 64, 1000, 100_000])
+def test_decompress_concatenated_with_padding(padding):
+    data = COMPRESSED_DATA + b"\x00" * padding + COMPRESSED_DATA
+    assert igzip.decompress(data) == DATA + DATA
+    # Also test with a small read buffer, so padding spans multiple reads.
+    with igzip.IGzipFile(fileobj=io.BytesIO(data), buffer_size=16) as f:
+        assert f.read() == DATA + DATA
+
+
+def test_decompress_trailing_padding():
+    data = COMPRESSED_DATA + b"\x00" * 1000
+    assert igzip.decompress(data) == DATA
+
+
 def test_decompress_missing_trailer():
     with pytest.raises(EOFError) as error:
         igzip.decompress(COMPRESSED_DATA[:-8])
@@ -473,3 +487,179 @@ def test_bgzip():
     with igzip.open(gzip_file, "rb") as gz:
         gz_data = gz.read()
     assert bgz_data == gz_data
+
+
+def test_prefetch_read():
+    with igzip.IGzipFile(TEST_FILE, "rb", prefetch=True) as prefetch_f:
+        prefetch_data = prefetch_f.read()
+        assert prefetch_f._prefetcher is not None
+    assert prefetch_f._prefetcher.closed
+    with gzip.open(TEST_FILE, "rb") as f:
+        data = f.read()
+    assert prefetch_data == data
+
+
+def test_prefetch_seek():
+    with open(TEST_FILE, "rb") as f:
+        compressed = f.read()
+    fileobj = io.BytesIO(compressed)
+    with igzip.IGzipFile(fileobj=fileobj, mode="rb", prefetch=True) as gz:
+        first = gz.read(100)
+        gz.read()
+        gz.seek(0)
+        assert gz.read(100) == first
+
+
+def test_read_buffer_size_selection(tmp_path):
+    assert igzip._read_buffer_size(io.BytesIO()) == igzip.READ_BUFFER_SIZE
+    small_file = tmp_path / "small"
+    small_file.write_bytes(b"small")
+    with open(small_file, "rb") as f:
+        assert igzip._read_buffer_size(f) == igzip.READ_BUFFER_SIZE
+    read_fd, write_fd = os.pipe()
+    try:
+        with open(read_fd, "rb", closefd=False) as f:
+            assert (igzip._read_buffer_size(f) ==
+                    igzip._PIPE_READ_BUFFER_SIZE)
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+
+def test_decompress_ibuf_size(tmp_path, capsysbinary):
+    test_file = tmp_path / "test.gz"
+    test_file.write_bytes(COMPRESSED_DATA)
+    sys.argv = ['', '-d', '-c', '--ibuf-size', '7', str(test_file)]
+    igzip.main()
+    out, err = capsysbinary.readouterr()
+    assert out == DATA
+
+
+@pytest.mark.parametrize("argv", [
+    ['', '-d', '-c', '--ibuf-size', '0'],
+    ['', '-d', '-c', '--ibuf-size', '-1'],
+    ['', '-c', '--ibuf-size', '7'],
+])
+def test_ibuf_size_invalid(argv, capsysbinary):
+    sys.argv = argv
+    with pytest.raises(SystemExit) as error:
+        igzip.main()
+    assert error.value.code == 2
+    out, err = capsysbinary.readouterr()
+    assert b"--ibuf-size" in err
+
+
+def test_igzipfile_readinto():
+    with igzip.IGzipFile(TEST_FILE, "rb") as f:
+        buffer = bytearray(1000)
+        assert f.readinto(buffer) == 1000
+    with gzip.open(TEST_FILE, "rb") as f:
+        assert f.read(1000) == bytes(buffer)
+
+
+def test_igzipfile_readinto_write_only(tmp_path):
+    with igzip.IGzipFile(tmp_path / "test.gz", "wb") as f:
+        with pytest.raises(OSError) as error:
+            f.readinto(bytearray(10))
+    error.match(r"readinto\(\) on write-only IGzipFile object")
+
+
+@pytest.mark.parametrize("mode", ["r", "rb"])
+def test_igzipfile_read_attributes(mode):
+    with igzip.IGzipFile(TEST_FILE, mode) as igzip_f:
+        with gzip.GzipFile(TEST_FILE, mode) as gzip_f:
+            assert igzip_f.mode == gzip_f.mode
+            assert igzip_f.name == gzip_f.name
+            assert igzip_f.read(1000) == gzip_f.read(1000)
+            assert igzip_f.mtime == gzip_f.mtime
+        assert not igzip_f.closed
+    assert igzip_f.closed
+    assert igzip_f.myfileobj is None
+
+
+def test_igzipfile_read_invalid_mode():
+    with pytest.raises(ValueError) as error:
+        igzip.IGzipFile(TEST_FILE, "rt")
+    error.match("Invalid mode")
+
+
+@pytest.mark.parametrize("mode", ["w", "wb", "a", "ab", "x", "xb"])
+def test_igzipfile_write_attributes(tmp_path, mode):
+    igzip_path = tmp_path / "igzip.gz"
+    gzip_path = tmp_path / "gzip.gz"
+    with igzip.IGzipFile(igzip_path, mode, mtime=0) as igzip_f:
+        with gzip.GzipFile(gzip_path, mode, mtime=0) as gzip_f:
+            assert igzip_f.mode == gzip_f.mode
+            assert igzip_f.name == str(igzip_path)
+            assert gzip_f.name == str(gzip_path)
+            igzip_f.write(DATA)
+            assert igzip_f.tell() == len(DATA)
+    assert igzip_f.closed
+    assert igzip_f.myfileobj is None
+    assert gzip.decompress(igzip_path.read_bytes()) == DATA
+
+
+def test_igzipfile_write_invalid_mode():
+    with pytest.raises(ValueError) as error:
+        igzip.IGzipFile(fileobj=io.BytesIO(), mode="wt")
+    error.match("Invalid mode")
+
+
+@pytest.mark.parametrize(["kwargs", "message"], [
+    ({"prefetch": True}, "prefetch"),
+    ({"buffer_size": 1024}, "buffer_size"),
+])
+@pytest.mark.parametrize("mode", ["wb", None])
+def test_igzipfile_write_read_only_options(kwargs, message, mode):
+    fileobj = io.BytesIO()
+    fileobj.mode = "wb"
+    with pytest.raises(ValueError) as error:
+        igzip.IGzipFile(fileobj=fileobj, mode=mode, **kwargs)
+    error.match(f"{message} can only be used when reading")
+
+
+@pytest.mark.parametrize("members", [
+    [b"A" * (1024 * 1024)],
+    [b"A" * (1024 * 1024), DATA],
+    [DATA, b"A" * (1024 * 1024)],
+    # Larger than the cap on the size hint.
+    [b"A" * (20 * 1024 * 1024)],
+])
+def test_decompress_size_hint(members):
+    compressed = b"".join(igzip.compress(member) for member in members)
+    assert igzip.decompress(compressed) == b"".join(members)
+    assert igzip.decompress(compressed + b"\x00" * 8) == b"".join(members)
+
+
+def test_prefetch_reader_stopped_worker():
+    reader = igzip._PrefetchReader(io.BytesIO(b"x" * 10), buffer_size=1,
+                                   queue_size=1)
+    # Stop the worker before it can post EOF.
+    reader._stop()
+    with pytest.raises(OSError) as error:
+        while reader.read(1):
+            pass
+    error.match("prefetch worker has stopped")
+    reader.close()
+
+
+def test_prefetch_reader_tell_seek():
+    data = bytes(range(256)) * 4
+    with igzip._PrefetchReader(io.BytesIO(data), buffer_size=100) as reader:
+        assert reader.read(10) == data[:10]
+        # The worker has read ahead, but tell reports the logical position.
+        assert reader.tell() == 10
+        assert reader.seek(5, io.SEEK_CUR) == 15
+        assert reader.read(10) == data[15:25]
+        assert reader.seek(-4, io.SEEK_END) == len(data) - 4
+        assert reader.read() == data[-4:]
+        assert reader.seek(0) == 0
+        assert reader.read(3) == data[:3]
+
+
+def test_prefetch_reader_seek_closed():
+    reader = igzip._PrefetchReader(io.BytesIO(b"data"))
+    reader.close()
+    with pytest.raises(ValueError):
+        reader.seek(0)
+    assert not reader.worker.is_alive()
@@ -16,7 +16,7 @@ import sys
 import zlib
 from typing import NamedTuple
 
-from isal import igzip_lib
+from isal import igzip_lib, isal_zlib
 from isal.igzip_lib import (
     COMP_DEFLATE, COMP_GZIP, COMP_GZIP_NO_HDR, COMP_ZLIB, COMP_ZLIB_NO_HDR,
     DECOMP_DEFLATE, DECOMP_GZIP, DECOMP_GZIP_NO_HDR, DECOMP_GZIP_NO_HDR_VER,
@@ -65,6 +65,14 @@ def test_compress_decompress(level, flag: Flag, mem_level, hist_bits):
     assert decomp == DATA
 
 
+@pytest.mark.parametrize(["level", "header"], list(itertools.product(
+    COMPRESS_LEVELS, [b"", b"header", b"h" * (64 * 1024)])))
+def test_compress_with_header(level, header):
+    comp = igzip_lib._compress_with_header(DATA, header, level, COMP_GZIP)
+    assert comp[:len(header)] == header
+    assert comp[len(header):] == igzip_lib.compress(DATA, level, COMP_GZIP)
+
+
 class TestIgzipDecompressor():
     # Tests adopted from CPython's test_bz2.py
     TEXT = DATA
@@ -103,6 +111,16 @@ class TestIgzipDecompressor():
         with pytest.raises(EOFError):
             igzd.decompress(b"")
 
+    def testZdict(self):
+        zdict = b"This is a simple test with igzip " * 10
+        compressor = isal_zlib.compressobj(wbits=-15, zdict=zdict)
+        compressed = compressor.compress(zdict[:100]) + compressor.flush()
+        # The decompressor holds the only reference to this dictionary and
+        # releases it again when it is deallocated.
+        igzd = IgzipDecompressor(zdict=bytes(bytearray(zdict)))
+        assert igzd.decompress(compressed) == zdict[:100]
+        del igzd
+
     @pytest.mark.skip(reason="Causes memory issues on CI systems.")
     def testDecompress4G(self):
         # "Test igzdecompressor.decompress() with >4GiB input"
@@ -255,3 +255,32 @@ def test_flush(tmp_path, threads):
         f.flush()
         assert gzip.decompress(test_file.read_bytes()) == b"123"
     assert gzip.decompress(test_file.read_bytes()) == b"123"
+
+
+@pytest.mark.parametrize(["level", "xfl"], [(0, 4), (1, 0), (2, 0), (3, 0)])
+def test_writer_gzip_header(level, xfl):
+    fileobj = io.BytesIO()
+    with igzip_threaded.open(fileobj, "wb", compresslevel=level) as f:
+        f.write(b"data")
+        f.flush()
+        f.write(b"data")
+    data = fileobj.getvalue()
+    header = b"\x1f\x8b\x08\x00\x00\x00\x00\x00" + bytes([xfl]) + b"\xff"
+    assert data.startswith(header)
+    # flush() starts a new member with the same header.
+    assert data.count(header) > 1
+    assert gzip.decompress(data) == b"datadata"
+
+
+def test_reader_stopped_worker():
+    with open(TEST_FILE, "rb") as test_f:
+        f = igzip_threaded._ThreadedGzipReader(test_f, queue_size=1,
+                                               block_size=1024)
+        # Stop the worker before it can post EOF.
+        f.running = False
+        f.worker.join()
+        with pytest.raises(OSError) as error:
+            while f.read(1024):
+                pass
+        error.match("decompression worker has stopped")
+        f.close()